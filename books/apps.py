@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BooksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "books"
+
+    def ready(self) -> None:
+        """
+        Connects the model signals that keep the catalog change log in sync.
+        """
+        from . import signals  # noqa: F401
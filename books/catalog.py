@@ -0,0 +1,57 @@
+import threading
+import time
+from typing import List
+
+from .models import BookChange
+
+# How often each process asks the DB for the catalog version, in seconds.
+VERSION_CHECK_INTERVAL: float = 1.0
+
+_version: int = 0
+_checked_at: float = float("-inf")
+_version_lock = threading.Lock()
+
+
+def current_catalog_version() -> int:
+    """
+    Returns the catalog version stamp: the id of the latest BookChange entry.
+
+    Every create, update or delete of a Book appends to the change log, so the
+    stamp grows whenever the catalog changes. The value is re-read at most once
+    per VERSION_CHECK_INTERVAL per process (an index-only MAX on the primary key),
+    so in-memory catalog structures can poll it on every request.
+
+    Returns:
+        int: The current version, 0 for an empty change log.
+    """
+    global _version, _checked_at
+    now: float = time.monotonic()
+    if now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _version
+
+    with _version_lock:
+        if now - _checked_at >= VERSION_CHECK_INTERVAL:
+            _version = (
+                BookChange.objects.order_by("-id").values_list("id", flat=True).first()
+                or 0
+            )
+            _checked_at = now
+    return _version
+
+
+def changed_book_ids(since_version: int, until_version: int) -> List[int]:
+    """
+    Returns the ids of the books touched between two catalog versions.
+
+    Args:
+        since_version (int): The version the caller was built from (exclusive).
+        until_version (int): The version the caller is catching up to (inclusive).
+
+    Returns:
+        List[int]: The distinct book ids, including deleted ones.
+    """
+    return list(
+        BookChange.objects.filter(id__gt=since_version, id__lte=until_version)
+        .values_list("book_id", flat=True)
+        .distinct()
+    )
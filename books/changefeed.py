@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Book, BookChange
+
+
+class CursorExpired(APIException):
+    """
+    Raised when a cursor is older than the change log retention window.
+
+    Tombstones older than the window may have been compacted away, so the client
+    must download the full catalog again.
+    """
+
+    status_code = 410
+    default_detail = "El cursor expiró; vuelve a descargar el catálogo completo."
+    default_code = "cursor_expired"
+
+
+def record_book_changes(book_ids: Iterable[int], action: str) -> None:
+    """
+    Appends one change log entry per book id.
+
+    Used by the Book signals and by bulk operations such as `queryset.update()`
+    that do not send them.
+
+    Args:
+        book_ids (Iterable[int]): The ids of the books that changed.
+        action (str): One of BookChange.CREATED, UPDATED or DELETED.
+    """
+    BookChange.objects.bulk_create(
+        [BookChange(book_id=book_id, action=action) for book_id in book_ids]
+    )
+
+
+def encode_cursor(change_id: int, watermark: datetime) -> str:
+    """
+    Builds the opaque cursor returned to clients.
+
+    The cursor holds the last change id the client has seen and a watermark no
+    later than the oldest change it has not read yet, which is used to detect
+    cursors whose pending tombstones may have been compacted.
+    """
+    return f"{change_id}-{int(watermark.timestamp())}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, datetime]:
+    """
+    Parses a cursor built by `encode_cursor`.
+
+    Raises:
+        ValidationError: If the cursor is malformed.
+        CursorExpired: If the cursor is older than BOOK_CHANGES_RETENTION_DAYS.
+    """
+    change_id, _, timestamp = cursor.partition("-")
+    if not (change_id.isdigit() and timestamp.isdigit()):
+        raise ValidationError({"since": "Cursor inválido."})
+
+    synced_at: datetime = datetime.fromtimestamp(int(timestamp), tz=dt_timezone.utc)
+    if synced_at < _retention_horizon():
+        raise CursorExpired()
+    return int(change_id), synced_at
+
+
+def _retention_horizon() -> datetime:
+    return timezone.now() - timedelta(days=settings.BOOK_CHANGES_RETENTION_DAYS)
+
+
+def changes_since(
+    last_change_id: int, limit: int
+) -> Tuple[List[Tuple[BookChange, Optional[Book]]], Optional[BookChange], bool]:
+    """
+    Collects the books changed after a change id, one entry per book.
+
+    Several changes to the same book within the page collapse into the latest one,
+    and the current rows of the surviving books are fetched with a single query.
+
+    Args:
+        last_change_id (int): The last change id the client has already seen.
+        limit (int): The maximum number of log entries to read.
+
+    Returns:
+        Tuple: The (change, book or None for tombstones) pairs ordered by change id,
+        the last log entry read (None if there were none) and whether more
+        entries remain.
+    """
+    changes: List[BookChange] = list(
+        BookChange.objects.filter(id__gt=last_change_id).order_by("id")[: limit + 1]
+    )
+    has_more: bool = len(changes) > limit
+    changes = changes[:limit]
+
+    latest: Dict[int, BookChange] = {}
+    for change in changes:
+        latest.pop(change.book_id, None)
+        latest[change.book_id] = change
+
+    books: Dict[int, Book] = Book.objects.in_bulk(
+        [
+            book_id
+            for book_id, change in latest.items()
+            if change.action != BookChange.DELETED
+        ]
+    )
+    # A book missing from in_bulk was deleted by a change past this page; the
+    # tombstone arrives on the next page, until then it is reported as deleted.
+    entries: List[Tuple[BookChange, Optional[Book]]] = [
+        (change, books.get(book_id)) for book_id, change in latest.items()
+    ]
+    last_read: Optional[BookChange] = changes[-1] if changes else None
+    return entries, last_read, has_more
+
+
+def compact_book_changes() -> Tuple[int, int]:
+    """
+    Shrinks the change log without breaking cursors inside the retention window.
+
+    - Entries superseded by a later entry for the same book are always removed:
+      any client behind them receives the later entry instead.
+    - Tombstones older than BOOK_CHANGES_RETENTION_DAYS are removed. A cursor's
+      watermark is never later than the first change it has not read, so a
+      client that could miss one of them is rejected by `decode_cursor`.
+
+    Returns:
+        Tuple[int, int]: The number of superseded entries and tombstones removed.
+    """
+    later_change = BookChange.objects.filter(
+        book_id=OuterRef("book_id"), id__gt=OuterRef("id")
+    )
+    superseded, _ = BookChange.objects.filter(Exists(later_change)).delete()
+    tombstones, _ = BookChange.objects.filter(
+        action=BookChange.DELETED, changed_at__lt=_retention_horizon()
+    ).delete()
+    return superseded, tombstones
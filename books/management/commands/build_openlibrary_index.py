@@ -0,0 +1,27 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from books.openlibrary_index import build_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the offline Open Library snapshot index from works, editions and "
+        "ratings dump files (plain or .gz)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("dumps", nargs="+", help="Open Library dump files.")
+        parser.add_argument(
+            "--output",
+            default=str(settings.OPENLIBRARY_INDEX_PATH),
+            help="Index file to write (default: OPENLIBRARY_INDEX_PATH).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        count: int = build_index(options["dumps"], options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} títulos indexados en {options['output']}.")
+        )
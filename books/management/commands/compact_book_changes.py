@@ -0,0 +1,20 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from books.changefeed import compact_book_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacts the catalog change log: drops superseded entries and tombstones "
+        "older than BOOK_CHANGES_RETENTION_DAYS."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        superseded, tombstones = compact_book_changes()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{superseded} cambios reemplazados y {tombstones} tombstones eliminados."
+            )
+        )
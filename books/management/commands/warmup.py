@@ -0,0 +1,17 @@
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from books.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Compiles templates, resolves URLconfs, connects to the DB and primes the "
+        "catalog caches, then prints the timing report."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        report = warm_up()
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:06
+
+from django.db import migrations, models
+
+
+def backfill_book_changes(apps, schema_editor):
+    """Seed the change log with a 'created' entry for every existing book."""
+    Book = apps.get_model('books', 'Book')
+    BookChange = apps.get_model('books', 'BookChange')
+    BookChange.objects.bulk_create(
+        (
+            BookChange(book_id=book_id, action='created')
+            for book_id in Book.objects.order_by('id').values_list('id', flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_book_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_id', models.BigIntegerField(db_index=True, verbose_name='Libro')),
+                ('action', models.CharField(choices=[('created', 'Creado'), ('updated', 'Actualizado'), ('deleted', 'Eliminado')], max_length=7, verbose_name='Acción')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha del cambio')),
+            ],
+            options={
+                'verbose_name': 'Cambio de libro',
+                'verbose_name_plural': 'Cambios de libros',
+            },
+        ),
+        migrations.RunPython(backfill_book_changes, migrations.RunPython.noop),
+    ]
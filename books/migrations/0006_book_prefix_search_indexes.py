@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:40
+
+from django.db import migrations
+
+# The admin searches with '^' (istartswith). SQLite compiles it to
+# `col LIKE 'x%' ESCAPE '\'`, which only uses an index built with NOCASE;
+# PostgreSQL compiles it to `UPPER(col::text) LIKE UPPER('x%')`, which needs an
+# expression index with text_pattern_ops. Plain indexes are not used by either.
+PREFIX_INDEXES = {
+    'sqlite': [
+        'CREATE INDEX "book_title_prefix_idx" ON "books_book" ("title" COLLATE NOCASE)',
+        'CREATE INDEX "book_author_prefix_idx" ON "books_book" ("author" COLLATE NOCASE)',
+    ],
+    'postgresql': [
+        'CREATE INDEX "book_title_prefix_idx" ON "books_book" (UPPER("title"::text) text_pattern_ops)',
+        'CREATE INDEX "book_author_prefix_idx" ON "books_book" (UPPER("author"::text) text_pattern_ops)',
+    ],
+}
+
+
+def create_prefix_indexes(apps, schema_editor):
+    """Create the case-insensitive prefix indexes for the current backend."""
+    for sql in PREFIX_INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in PREFIX_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS "book_title_prefix_idx"')
+        schema_editor.execute('DROP INDEX IF EXISTS "book_author_prefix_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_bookchange'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -41,6 +41,10 @@ class Book(models.Model):
         verbose_name = "Libro"
         verbose_name_plural = "Libros"
         constraints = [UniqueConstraint(fields=["title"], name="unique_title")]
+        indexes = [
+            models.Index(fields=["category"], name="book_category_idx"),
+            models.Index(fields=["publication_date"], name="book_publication_date_idx"),
+        ]
 
     def __str__(self) -> str:
         """
@@ -76,3 +80,45 @@ class Favorite(models.Model):
         Format: "username - book title"
         """
         return f"{self.user.username} - {self.book.title}"
+
+
+class BookChange(models.Model):
+    """
+    An entry of the catalog change log, written from the Book signals.
+
+    The log backs the incremental `/api/libros/cambios/` feed. `book_id` is a plain
+    integer rather than a foreign key so that deletions survive as tombstones.
+
+    Attributes:
+        book_id (int): The id of the book that changed.
+        action (str): Whether the book was created, updated or deleted.
+        changed_at (datetime): When the change was recorded.
+    """
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ACTION_CHOICES = [
+        (CREATED, "Creado"),
+        (UPDATED, "Actualizado"),
+        (DELETED, "Eliminado"),
+    ]
+
+    book_id = models.BigIntegerField(verbose_name="Libro", db_index=True)
+    action = models.CharField(
+        max_length=7, choices=ACTION_CHOICES, verbose_name="Acción"
+    )
+    changed_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Fecha del cambio", db_index=True
+    )
+
+    class Meta:
+        verbose_name = "Cambio de libro"
+        verbose_name_plural = "Cambios de libros"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the change.
+        Format: "book id action"
+        """
+        return f"{self.book_id} {self.action}"
@@ -0,0 +1,389 @@
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .text import normalize_text
+
+# --- ON-DISK FORMAT ---
+#
+# header     : magic, version, record count, publisher count
+# records    : fixed-size entries sorted by the 64-bit hash of the normalized title
+#              (title hash, cover id, first publish year, publisher index, rating)
+# offsets    : publisher count + 1 little-endian uint32 offsets into the blob
+# blob       : the UTF-8 encoded publisher names, back to back
+#
+# Every lookup is a binary search over the records followed by at most one slice of
+# the publisher blob, all read straight from the memory map. The OS shares those
+# pages between every worker process that maps the same file.
+
+MAGIC: bytes = b"OLSNAP\x00\x00"
+VERSION: int = 1
+HEADER = struct.Struct("<8sIII")
+RECORD = struct.Struct("<QiiIf")
+HASH = struct.Struct("<Q")
+OFFSET = struct.Struct("<I")
+NO_PUBLISHER: int = 0xFFFFFFFF
+
+_YEAR = re.compile(r"\b(\d{4})\b")
+
+
+@dataclass
+class SnapshotEntry:
+    """
+    The Open Library metadata stored in the snapshot for one normalized title.
+
+    Attributes:
+        cover_id (Optional[int]): The Open Library cover id.
+        first_publish_year (Optional[int]): The earliest known publication year.
+        publisher (Optional[str]): The publisher of the work's first edition with one.
+        ratings_average (Optional[float]): The average user rating.
+    """
+
+    cover_id: Optional[int]
+    first_publish_year: Optional[int]
+    publisher: Optional[str]
+    ratings_average: Optional[float]
+
+
+def title_hash(title: str) -> int:
+    """
+    Returns the 64-bit key of a title, computed on its normalized form.
+    """
+    digest: bytes = hashlib.blake2b(
+        normalize_text(title).encode("utf-8"), digest_size=8
+    ).digest()
+    return HASH.unpack(digest)[0]
+
+
+def _parse_year(value: Any) -> Optional[int]:
+    match = _YEAR.search(str(value or ""))
+    return int(match.group(1)) if match else None
+
+
+def _open_dump(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+# --- BUILD ---
+
+# Parsed dump lines are spilled to the staging database in batches of this size.
+BUILD_BATCH_SIZE: int = 10_000
+# Page cache of the staging database, in KiB: the bound on the build's memory use.
+BUILD_CACHE_KIB: int = 64 * 1024
+# SQLite integers are signed 64-bit; title hashes are stored shifted by this.
+_HASH_SHIFT: int = 1 << 63
+
+_STAGING_SCHEMA: str = """
+    CREATE TABLE works (
+        work_key TEXT PRIMARY KEY, title_hash INTEGER, cover_id INTEGER, year INTEGER
+    );
+    CREATE TABLE editions (
+        work_key TEXT PRIMARY KEY, edition_count INTEGER, publisher TEXT, year INTEGER
+    );
+    CREATE TABLE ratings (work_key TEXT PRIMARY KEY, total INTEGER, count INTEGER);
+    CREATE TABLE publishers (name TEXT PRIMARY KEY);
+"""
+_UPSERT_WORK: str = "INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?)"
+_UPSERT_EDITION: str = """
+    INSERT INTO editions VALUES (?, 1, ?, ?)
+    ON CONFLICT (work_key) DO UPDATE SET
+        edition_count = edition_count + 1,
+        publisher = COALESCE(publisher, excluded.publisher),
+        year = CASE WHEN excluded.year AND (year = 0 OR excluded.year < year)
+               THEN excluded.year ELSE year END
+"""
+_UPSERT_RATING: str = """
+    INSERT INTO ratings VALUES (?, ?, ?)
+    ON CONFLICT (work_key) DO UPDATE SET
+        total = total + excluded.total, count = count + excluded.count
+"""
+# Several works can share a normalized title: the first row of each title hash is
+# the one with most editions, the closest match to the relevance order of the
+# live search.
+_SELECT_RECORDS: str = """
+    SELECT w.title_hash, w.cover_id, w.year, e.year, p.rowid, r.total, r.count
+    FROM works w
+    LEFT JOIN editions e ON e.work_key = w.work_key
+    LEFT JOIN publishers p ON p.name = e.publisher
+    LEFT JOIN ratings r ON r.work_key = w.work_key
+    ORDER BY w.title_hash, COALESCE(e.edition_count, 0) DESC, w.rowid
+"""
+
+
+def build_index(dump_paths: Iterable[str], output_path: str) -> int:
+    """
+    Streams Open Library dump files into a snapshot index.
+
+    Accepts the works and editions dumps (`type<TAB>key<TAB>revision<TAB>
+    last_modified<TAB>json`) and the ratings dump (`work<TAB>edition<TAB>rating
+    <TAB>date`), plain or gzipped, in any order. The fields the detail page needs
+    are spilled, per work, to a temporary SQLite database next to `output_path`,
+    so memory stays bounded by BUILD_BATCH_SIZE lines plus BUILD_CACHE_KIB of page
+    cache however large the dumps are; the disk needs room for roughly the
+    extracted fields. The file is swapped in atomically, so running workers never
+    see a partial index.
+
+    Args:
+        dump_paths (Iterable[str]): The dump files to read.
+        output_path (str): Where to write the index.
+
+    Returns:
+        int: The number of titles in the index.
+    """
+    directory: str = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(dir=directory) as staging_dir:
+        staging = sqlite3.connect(os.path.join(staging_dir, "staging.sqlite3"))
+        try:
+            staging.execute("PRAGMA journal_mode = OFF")
+            staging.execute("PRAGMA synchronous = OFF")
+            staging.execute(f"PRAGMA cache_size = -{BUILD_CACHE_KIB}")
+            staging.executescript(_STAGING_SCHEMA)
+            for path in dump_paths:
+                _stage_dump(staging, path)
+            staging.execute(
+                "INSERT INTO publishers (name) SELECT DISTINCT publisher "
+                "FROM editions WHERE publisher IS NOT NULL ORDER BY publisher"
+            )
+            staging.commit()
+            return _write_index(output_path, staging)
+        finally:
+            staging.close()
+
+
+def _stage_dump(staging: sqlite3.Connection, path: str) -> None:
+    batches: Dict[str, List[Tuple[Any, ...]]] = {
+        _UPSERT_WORK: [],
+        _UPSERT_EDITION: [],
+        _UPSERT_RATING: [],
+    }
+    with _open_dump(path) as dump:
+        for line_number, line in enumerate(dump, 1):
+            columns: List[str] = line.rstrip("\n").split("\t")
+            if len(columns) == 5 and columns[0] == "/type/work":
+                work = _read_work(columns[1], json.loads(columns[4]))
+                if work is not None:
+                    batches[_UPSERT_WORK].append(work)
+            elif len(columns) == 5 and columns[0] == "/type/edition":
+                batches[_UPSERT_EDITION].extend(_read_edition(json.loads(columns[4])))
+            elif len(columns) >= 3 and columns[0].startswith("/works/"):
+                rated: bool = columns[2].isdigit()
+                batches[_UPSERT_RATING].append(
+                    (columns[0], int(columns[2]) if rated else 0, int(rated))
+                )
+            if line_number % BUILD_BATCH_SIZE == 0:
+                _flush(staging, batches)
+    _flush(staging, batches)
+
+
+def _flush(
+    staging: sqlite3.Connection, batches: Dict[str, List[Tuple[Any, ...]]]
+) -> None:
+    with staging:
+        for statement, rows in batches.items():
+            staging.executemany(statement, rows)
+            rows.clear()
+
+
+def _read_work(work_key: str, work: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    title: str = work.get("title") or ""
+    if not normalize_text(title):
+        return None
+    covers: List[int] = [c for c in work.get("covers", []) if c and c > 0]
+    return (
+        work_key,
+        title_hash(title) - _HASH_SHIFT,
+        covers[0] if covers else -1,
+        _parse_year(work.get("first_publish_date")) or 0,
+    )
+
+
+def _read_edition(edition: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+    year: int = _parse_year(edition.get("publish_date")) or 0
+    names: List[str] = [p.strip() for p in edition.get("publishers", []) if p.strip()]
+    for work in edition.get("works", []):
+        if work.get("key"):
+            yield work["key"], names[0] if names else None, year
+
+
+def _write_index(output_path: str, staging: sqlite3.Connection) -> int:
+    """
+    Writes the staged works to `output_path`, one record per title hash.
+
+    Records are streamed in hash order; the header is rewritten at the end, once
+    the number of distinct titles is known.
+    """
+    publisher_count: int = staging.execute(
+        "SELECT COUNT(*) FROM publishers"
+    ).fetchone()[0]
+    record_count: int = 0
+    previous_hash: Optional[int] = None
+
+    tmp_path: str = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, record_count, publisher_count))
+        for (
+            stored_hash,
+            cover_id,
+            year,
+            edition_year,
+            publisher_row,
+            total,
+            count,
+        ) in staging.execute(_SELECT_RECORDS):
+            if stored_hash == previous_hash:
+                continue
+            previous_hash = stored_hash
+            out.write(
+                RECORD.pack(
+                    stored_hash + _HASH_SHIFT,
+                    cover_id,
+                    year or edition_year or 0,
+                    publisher_row - 1 if publisher_row else NO_PUBLISHER,
+                    total / count if count else 0.0,
+                )
+            )
+            record_count += 1
+
+        offset: int = 0
+        for (name,) in staging.execute("SELECT name FROM publishers ORDER BY rowid"):
+            out.write(OFFSET.pack(offset))
+            offset += len(name.encode("utf-8"))
+        out.write(OFFSET.pack(offset))
+        for (name,) in staging.execute("SELECT name FROM publishers ORDER BY rowid"):
+            out.write(name.encode("utf-8"))
+
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, VERSION, record_count, publisher_count))
+    os.replace(tmp_path, output_path)
+    return record_count
+
+
+# --- RUNTIME ---
+
+
+class OpenLibraryIndex:
+    """
+    Read-only, memory-mapped view of a snapshot index built by `build_index`.
+
+    Attributes:
+        path (str): The index file.
+        record_count (int): The number of titles in the index.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, "rb") as index_file:
+            stat = os.fstat(index_file.fileno())
+            self._identity: Tuple[int, int] = (stat.st_ino, stat.st_mtime_ns)
+            self._map: mmap.mmap = mmap.mmap(
+                index_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        magic, version, self.record_count, publisher_count = HEADER.unpack_from(
+            self._map, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an Open Library snapshot index.")
+
+        self._records_at: int = HEADER.size
+        self._offsets_at: int = self._records_at + self.record_count * RECORD.size
+        self._blob_at: int = self._offsets_at + (publisher_count + 1) * OFFSET.size
+
+    def is_current(self) -> bool:
+        """
+        Returns False once the file on disk has been replaced by a new build.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns) == self._identity
+
+    def lookup(self, title: str) -> Optional[SnapshotEntry]:
+        """
+        Finds the metadata of a title with a binary search over the mapped records.
+
+        Args:
+            title (str): The book title, in any case or accentuation.
+
+        Returns:
+            Optional[SnapshotEntry]: The stored metadata, or None if the title is unknown.
+        """
+        key: int = title_hash(title)
+        low, high = 0, self.record_count
+        while low < high:
+            middle: int = (low + high) // 2
+            current: int = HASH.unpack_from(
+                self._map, self._records_at + middle * RECORD.size
+            )[0]
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == self.record_count:
+            return None
+        found_key, cover_id, year, publisher_idx, rating = RECORD.unpack_from(
+            self._map, self._records_at + low * RECORD.size
+        )
+        if found_key != key:
+            return None
+
+        return SnapshotEntry(
+            cover_id=cover_id if cover_id >= 0 else None,
+            first_publish_year=year or None,
+            publisher=(
+                self._publisher(publisher_idx)
+                if publisher_idx != NO_PUBLISHER
+                else None
+            ),
+            ratings_average=rating or None,
+        )
+
+    def _publisher(self, index: int) -> str:
+        start, end = struct.unpack_from(
+            "<II", self._map, self._offsets_at + index * OFFSET.size
+        )
+        return self._map[self._blob_at + start : self._blob_at + end].decode("utf-8")
+
+
+_index: Optional[OpenLibraryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_snapshot_index(path: str) -> Optional[OpenLibraryIndex]:
+    """
+    Returns the process-wide index for `path`, mapping it on first use.
+
+    The mapping is reopened when the file is rebuilt, and None is returned while
+    no index exists, so callers can fall back to the live API.
+
+    Args:
+        path (str): The index file, usually settings.OPENLIBRARY_INDEX_PATH.
+
+    Returns:
+        Optional[OpenLibraryIndex]: The mapped index, or None if it is missing.
+    """
+    global _index
+    index: Optional[OpenLibraryIndex] = _index
+    if index is not None and index.path == path and index.is_current():
+        return index
+
+    with _index_lock:
+        if _index is None or _index.path != path or not _index.is_current():
+            try:
+                _index = OpenLibraryIndex(path)
+            except (OSError, ValueError):
+                _index = None
+        return _index
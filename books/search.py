@@ -0,0 +1,302 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import close_old_connections
+from django.db.models import Count
+
+from .catalog import changed_book_ids, current_catalog_version
+from .models import Book
+from .text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+SUGGESTIONS_LIMIT: int = 10
+# Prefixes matching more keys than this have their results memoized. Only a
+# bounded number of prefixes can match that many keys, so the memo stays small.
+MEMO_MIN_MATCHES: int = 128
+MEMO_MAX_SIZE: int = 10_000
+# Above this many changed books a full rebuild is cheaper than a merge.
+FULL_REBUILD_CHANGES: int = 1_000
+# Full rebuilds also refresh popularity, which favorites change without
+# bumping the catalog version.
+MAX_INDEX_AGE: float = 60 * 60
+# How often the background thread checks the catalog version.
+REFRESH_SECONDS: float = 2
+# Prefixes up to this length are memoized ahead of time after every build, so
+# the broadest (and slowest) queries never run on the request path.
+WARM_PREFIX_LENGTH: int = 2
+
+
+@dataclass
+class Suggestion:
+    """
+    A book as returned by the typeahead.
+
+    Attributes:
+        id (int): The book id.
+        title (str): The book title.
+        author (str): The book author.
+        popularity (int): How many users have the book as favorite.
+    """
+
+    id: int
+    title: str
+    author: str
+    popularity: int
+
+
+@dataclass
+class PrefixIndex:
+    """
+    Immutable prefix index over the normalized titles and authors of the catalog.
+
+    Every book contributes one key per word position of its title and author
+    ('el senor de los anillos', 'senor de los anillos', ... 'tolkien'), so a
+    prefix matches any word, not only the start of the title. Keys are kept in a
+    sorted list with the book ids in a parallel array: a query is a binary search
+    plus a scan of the matching range.
+
+    Attributes:
+        version (int): The catalog version the index reflects.
+        built_at (float): Monotonic time of the last full build.
+        keys (List[str]): The sorted keys.
+        book_ids (array): The book id of each key.
+        books (Dict[int, Suggestion]): The indexed books by id.
+    """
+
+    version: int
+    built_at: float
+    keys: List[str]
+    book_ids: array
+    books: Dict[int, Suggestion]
+    _memo: Dict[str, List[Suggestion]] = field(default_factory=dict)
+
+    def suggest(self, query: str, limit: int = SUGGESTIONS_LIMIT) -> List[Suggestion]:
+        """
+        Returns the most popular books with a title or author word starting with `query`.
+
+        Args:
+            query (str): The text typed so far, in any case or accentuation.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            List[Suggestion]: Matches ordered by popularity, then title.
+        """
+        prefix: str = normalize_text(query)
+        if not prefix:
+            return []
+
+        if limit == SUGGESTIONS_LIMIT:
+            # .get(): another thread may clear the memo between a check and a read.
+            cached: Optional[List[Suggestion]] = self._memo.get(prefix)
+            if cached is not None:
+                return cached
+
+        start: int = bisect_left(self.keys, prefix)
+        end: int = bisect_left(self.keys, prefix + "\U0010ffff", start)
+        result: List[Suggestion] = heapq.nsmallest(
+            limit,
+            (self.books[book_id] for book_id in set(self.book_ids[start:end])),
+            key=lambda book: (-book.popularity, book.title),
+        )
+
+        memoize: bool = end - start > MEMO_MIN_MATCHES and limit == SUGGESTIONS_LIMIT
+        if memoize and len(self._memo) >= MEMO_MAX_SIZE:
+            self._memo.clear()
+        if memoize:
+            self._memo[prefix] = result
+        return result
+
+    def warm(self, prefixes: Iterable[str]) -> None:
+        """
+        Memoizes the given prefixes plus every indexed prefix up to WARM_PREFIX_LENGTH.
+        """
+        short: Set[str] = {
+            key[:length]
+            for key in self.keys
+            for length in range(1, WARM_PREFIX_LENGTH + 1)
+        }
+        for prefix in short.union(prefixes):
+            self.suggest(prefix)
+
+
+def _index_keys(book: Suggestion) -> Iterator[Tuple[str, int]]:
+    keys = set()
+    for text in (book.title, book.author):
+        words: List[str] = normalize_text(text).split()
+        keys.update(" ".join(words[start:]) for start in range(len(words)))
+    for key in sorted(keys):
+        yield key, book.id
+
+
+def _load_books(book_ids: Optional[Iterable[int]] = None) -> Dict[int, Suggestion]:
+    books = Book.objects.all()
+    if book_ids is not None:
+        books = books.filter(id__in=list(book_ids))
+    rows = books.annotate(popularity=Count("favorited_by")).values_list(
+        "id", "title", "author", "popularity"
+    )
+    return {row[0]: Suggestion(*row) for row in rows}
+
+
+def _make_index(
+    version: int,
+    built_at: float,
+    books: Dict[int, Suggestion],
+    entries: Iterable[Tuple[str, int]],
+) -> PrefixIndex:
+    keys: List[str] = []
+    book_ids: array = array("q")
+    for key, book_id in entries:
+        keys.append(key)
+        book_ids.append(book_id)
+    return PrefixIndex(version, built_at, keys, book_ids, books)
+
+
+def build_prefix_index(version: int) -> PrefixIndex:
+    """
+    Builds the index from scratch with one query over the whole catalog.
+    """
+    books: Dict[int, Suggestion] = _load_books()
+    entries: List[Tuple[str, int]] = sorted(
+        entry for book in books.values() for entry in _index_keys(book)
+    )
+    return _make_index(version, time.monotonic(), books, entries)
+
+
+def refresh_prefix_index(index: PrefixIndex, version: int) -> PrefixIndex:
+    """
+    Brings an index up to `version` by reloading only the books that changed.
+
+    The unchanged entries are merged with the new ones in a single linear pass,
+    and a new index is returned: readers holding the old one are not affected.
+
+    Args:
+        index (PrefixIndex): The current index.
+        version (int): The catalog version to catch up to.
+
+    Returns:
+        PrefixIndex: The updated index.
+    """
+    changed: List[int] = changed_book_ids(index.version, version)
+    if len(changed) > FULL_REBUILD_CHANGES:
+        return build_prefix_index(version)
+
+    changed_set = set(changed)
+    reloaded: Dict[int, Suggestion] = _load_books(changed)
+    books: Dict[int, Suggestion] = {
+        book_id: book
+        for book_id, book in index.books.items()
+        if book_id not in changed_set
+    }
+    books.update(reloaded)
+
+    kept: Iterator[Tuple[str, int]] = (
+        (key, book_id)
+        for key, book_id in zip(index.keys, index.book_ids)
+        if book_id not in changed_set
+    )
+    added: List[Tuple[str, int]] = sorted(
+        entry for book in reloaded.values() for entry in _index_keys(book)
+    )
+    refreshed: PrefixIndex = _make_index(
+        version, index.built_at, books, heapq.merge(kept, added)
+    )
+
+    # Memoized results stay valid unless a changed book matched the prefix,
+    # before or after the change.
+    changed_keys: List[str] = sorted(
+        key
+        for book_id in changed_set
+        for book in (index.books.get(book_id), reloaded.get(book_id))
+        if book is not None
+        for key, _ in _index_keys(book)
+    )
+    stale: List[str] = []
+    for prefix, result in list(index._memo.items()):
+        position: int = bisect_left(changed_keys, prefix)
+        if position < len(changed_keys) and changed_keys[position].startswith(prefix):
+            stale.append(prefix)
+        else:
+            refreshed._memo[prefix] = result
+    refreshed.warm(stale)
+    return refreshed
+
+
+# --- PER-PROCESS STATE ---
+
+_index: Optional[PrefixIndex] = None
+_refresher_pid: Optional[int] = None
+_index_lock = threading.Lock()
+
+
+def _refresh() -> None:
+    """
+    Brings the index up to the current catalog version, or rebuilds it when old.
+
+    The new index is built and warmed before the module reference is swapped, so
+    readers always query a complete index, either the old or the new one.
+    """
+    global _index
+    index: Optional[PrefixIndex] = _index
+    version: int = current_catalog_version()
+    if index is None or time.monotonic() - index.built_at >= MAX_INDEX_AGE:
+        rebuilt: PrefixIndex = build_prefix_index(version)
+        rebuilt.warm(index._memo if index is not None else ())
+        _index = rebuilt
+    elif index.version != version:
+        _index = refresh_prefix_index(index, version)
+
+
+def _refresh_loop() -> None:
+    # The first build is warmed here rather than on the request that triggered it.
+    index: Optional[PrefixIndex] = _index
+    try:
+        if index is not None:
+            index.warm(())
+    except Exception:
+        logger.exception("Prefix index warmup failed")
+    while True:
+        time.sleep(REFRESH_SECONDS)
+        try:
+            # This thread's connection is never closed by a request_finished signal.
+            close_old_connections()
+            _refresh()
+        except Exception:
+            logger.exception("Prefix index refresh failed")
+
+
+def get_prefix_index() -> PrefixIndex:
+    """
+    Returns this process's prefix index.
+
+    The first call builds the index synchronously and starts a daemon thread that
+    refreshes it incrementally when the catalog version changes and rebuilds it
+    after MAX_INDEX_AGE seconds; afterwards this is a plain attribute read, and
+    queries never wait for a build.
+
+    Returns:
+        PrefixIndex: The latest index built by this process.
+    """
+    global _index, _refresher_pid
+    index: Optional[PrefixIndex] = _index
+    if index is not None and _refresher_pid == os.getpid():
+        return index
+
+    with _index_lock:
+        # Threads do not survive fork(): a pre-forked worker starts its own.
+        if _refresher_pid != os.getpid():
+            if _index is None:
+                _index = build_prefix_index(current_catalog_version())
+            threading.Thread(
+                target=_refresh_loop, name="prefix-index", daemon=True
+            ).start()
+            _refresher_pid = os.getpid()
+        return _index
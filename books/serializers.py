@@ -3,6 +3,8 @@ from .models import Book
 
 
 class BookSerializer(serializers.ModelSerializer):
+    is_favorite = serializers.SerializerMethodField()
+
     class Meta:
         model = Book
         fields = [
@@ -13,4 +15,11 @@ class BookSerializer(serializers.ModelSerializer):
             "category",
             "publication_date",
             "image",
+            "is_favorite",
         ]
+
+    def get_is_favorite(self, book: Book) -> bool:
+        """
+        Checks the book against the favorite ids provided by the view context.
+        """
+        return book.id in self.context.get("favorite_ids", ())
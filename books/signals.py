@@ -0,0 +1,26 @@
+from typing import Any, Type
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .changefeed import record_book_changes
+from .models import Book, BookChange
+
+
+@receiver(post_save, sender=Book)
+def book_saved(
+    sender: Type[Book], instance: Book, created: bool, **kwargs: Any
+) -> None:
+    """
+    Records the creation or update of a book in the change log.
+    """
+    action: str = BookChange.CREATED if created else BookChange.UPDATED
+    record_book_changes([instance.pk], action)
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender: Type[Book], instance: Book, **kwargs: Any) -> None:
+    """
+    Records a tombstone for a deleted book in the change log.
+    """
+    record_book_changes([instance.pk], BookChange.DELETED)
@@ -0,0 +1,363 @@
+import logging
+import os
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models.fields.files import FieldFile
+
+from .catalog import current_catalog_version
+from .models import Book
+
+logger = logging.getLogger(__name__)
+
+# Orderings served from the snapshot; the "-" variants are the reversed arrays.
+ORDERINGS: Tuple[str, ...] = ("publication_date", "title")
+DEFAULT_ORDERING: str = "publication_date"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class BookRow:
+    """
+    A read-only book materialized from the snapshot, for templates and serializers.
+
+    Exposes the same attributes as Book (`id`, `title`, `author`, `category`,
+    `description`, `publication_date`, `image`). Rows are only created for the
+    books actually rendered, so a page costs `page size` objects, not `catalog size`.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "author",
+        "category",
+        "description",
+        "publication_date",
+        "_image",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        author: str,
+        category: str,
+        description: str,
+        publication_date: datetime,
+        image: str,
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.author = author
+        self.category = category
+        self.description = description
+        self.publication_date = publication_date
+        self._image = image
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def image(self) -> FieldFile:
+        """
+        Returns the cover as a FieldFile, so `.url` and truthiness behave like Book.image.
+        """
+        return FieldFile(None, Book._meta.get_field("image"), self._image)
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class CatalogSnapshot:
+    """
+    Immutable, columnar copy of the Book table held by each worker.
+
+    Each field is one column: ids and publication dates (epoch microseconds) are
+    typed arrays, text fields are tuples of str, and categories are stored once and
+    referenced by a small integer code. Orderings are precomputed permutations of
+    row positions, and filtered views are memoized per (category, ordering).
+
+    Attributes:
+        version (int): The catalog version the snapshot was built from.
+        memory_bytes (int): Approximate memory held by the columns and orderings.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        ids: array,
+        titles: Tuple[str, ...],
+        authors: Tuple[str, ...],
+        descriptions: Tuple[str, ...],
+        images: Tuple[str, ...],
+        published_us: array,
+        category_codes: array,
+        categories: Tuple[str, ...],
+    ) -> None:
+        self.version: int = version
+        self._ids = ids
+        self._titles = titles
+        self._authors = authors
+        self._descriptions = descriptions
+        self._images = images
+        self._published_us = published_us
+        self._category_codes = category_codes
+        self.categories: Tuple[str, ...] = categories
+        self._category_index: Dict[str, int] = {
+            name: code for code, name in enumerate(categories)
+        }
+
+        positions = range(len(ids))
+        self._orderings: Dict[str, array] = {
+            "publication_date": array(
+                "I", sorted(positions, key=lambda i: (published_us[i], ids[i]))
+            ),
+            "title": array("I", sorted(positions, key=lambda i: (titles[i], ids[i]))),
+        }
+        for name in ORDERINGS:
+            self._orderings[f"-{name}"] = self._orderings[name][::-1]
+        self._views: Dict[Tuple[int, str], array] = {}
+        self.memory_bytes: int = self._measure()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _measure(self) -> int:
+        size: int = sum(
+            sys.getsizeof(column)
+            for column in (self._ids, self._published_us, self._category_codes)
+        )
+        for column in (
+            self._titles,
+            self._authors,
+            self._descriptions,
+            self._images,
+            self.categories,
+        ):
+            size += sys.getsizeof(column) + sum(sys.getsizeof(s) for s in column)
+        size += sum(sys.getsizeof(order) for order in self._orderings.values())
+        return size
+
+    def row(self, position: int) -> BookRow:
+        """
+        Materializes the book stored at a row position.
+        """
+        return BookRow(
+            self._ids[position],
+            self._titles[position],
+            self._authors[position],
+            self.categories[self._category_codes[position]],
+            self._descriptions[position],
+            _EPOCH + timedelta(microseconds=self._published_us[position]),
+            self._images[position],
+        )
+
+    def select(
+        self, category: Optional[str] = None, ordering: str = DEFAULT_ORDERING
+    ) -> "SnapshotRows":
+        """
+        Returns the books of a category (or all of them) in the requested order.
+
+        Args:
+            category (Optional[str]): Exact category to filter on, None for all books.
+            ordering (str): One of ORDERINGS, optionally prefixed with '-'.
+
+        Returns:
+            SnapshotRows: A lazy sequence of BookRow, ready for slicing/pagination.
+        """
+        if ordering not in self._orderings:
+            ordering = DEFAULT_ORDERING
+        if not category:
+            return SnapshotRows(self, self._orderings[ordering])
+
+        code: Optional[int] = self._category_index.get(category)
+        if code is None:
+            return SnapshotRows(self, array("I"))
+
+        key = (code, ordering)
+        positions: Optional[array] = self._views.get(key)
+        if positions is None:
+            codes = self._category_codes
+            positions = array(
+                "I", (p for p in self._orderings[ordering] if codes[p] == code)
+            )
+            self._views[key] = positions
+        return SnapshotRows(self, positions)
+
+
+class SnapshotRows(Sequence[BookRow]):
+    """
+    Lazy sequence of snapshot rows; slicing materializes only the requested rows.
+
+    Supports `len()` and slicing, which is all Django's Paginator and DRF's
+    LimitOffsetPagination need.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot, positions: array) -> None:
+        self._snapshot = snapshot
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def count(self) -> int:  # type: ignore[override]
+        return len(self._positions)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[BookRow, List[BookRow]]:
+        if isinstance(index, slice):
+            return [self._snapshot.row(p) for p in self._positions[index]]
+        return self._snapshot.row(self._positions[index])
+
+    def __iter__(self) -> Iterator[BookRow]:
+        row = self._snapshot.row
+        return (row(p) for p in self._positions)
+
+
+def build_catalog_snapshot(version: int, max_bytes: int) -> Optional[CatalogSnapshot]:
+    """
+    Reads the Book table once and builds a snapshot of it.
+
+    The text columns are measured while streaming: the build is abandoned (and
+    None returned) as soon as they exceed `max_bytes`, so an oversized catalog
+    never holds the memory, and callers fall back to the database.
+
+    Args:
+        version (int): The catalog version read before the query.
+        max_bytes (int): The memory budget for the snapshot.
+
+    Returns:
+        Optional[CatalogSnapshot]: The snapshot, or None if it would exceed the budget.
+    """
+    ids: array = array("q")
+    published_us: array = array("q")
+    category_codes: array = array("I")
+    titles: List[str] = []
+    authors: List[str] = []
+    descriptions: List[str] = []
+    images: List[str] = []
+    categories: Dict[str, int] = {}
+    text_bytes: int = 0
+
+    rows = (
+        Book.objects.order_by("id")
+        .values_list(
+            "id",
+            "title",
+            "author",
+            "category",
+            "description",
+            "publication_date",
+            "image",
+        )
+        .iterator(chunk_size=2000)
+    )
+    for book_id, title, author, category, description, published, image in rows:
+        text_bytes += (
+            sys.getsizeof(title) + sys.getsizeof(author) + sys.getsizeof(description)
+        )
+        if text_bytes > max_bytes:
+            logger.warning(
+                "Catalog snapshot exceeds CATALOG_SNAPSHOT_MAX_BYTES (%s); "
+                "serving the catalog from the database.",
+                max_bytes,
+            )
+            return None
+
+        ids.append(book_id)
+        published_us.append((published - _EPOCH) // timedelta(microseconds=1))
+        category_codes.append(categories.setdefault(category, len(categories)))
+        titles.append(title)
+        authors.append(author)
+        descriptions.append(description)
+        images.append(image or "")
+
+    snapshot = CatalogSnapshot(
+        version,
+        ids,
+        tuple(titles),
+        tuple(authors),
+        tuple(descriptions),
+        tuple(images),
+        published_us,
+        category_codes,
+        tuple(categories),
+    )
+    if snapshot.memory_bytes > max_bytes:
+        logger.warning(
+            "Catalog snapshot uses %s bytes, over CATALOG_SNAPSHOT_MAX_BYTES (%s); "
+            "serving the catalog from the database.",
+            snapshot.memory_bytes,
+            max_bytes,
+        )
+        return None
+    return snapshot
+
+
+# --- PER-PROCESS STATE ---
+
+_snapshot: Optional[CatalogSnapshot] = None
+# Version of the last build attempt, including ones abandoned for size.
+_built_version: Optional[int] = None
+_refresher_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _refresh() -> None:
+    """
+    Rebuilds the snapshot if the catalog version moved since the last build.
+
+    The new snapshot is fully built before the module reference is swapped, so
+    readers always see a complete snapshot, either the old or the new one.
+    """
+    global _snapshot, _built_version
+    version: int = current_catalog_version()
+    if version == _built_version:
+        return
+    snapshot = build_catalog_snapshot(version, settings.CATALOG_SNAPSHOT_MAX_BYTES)
+    _snapshot, _built_version = snapshot, version
+
+
+def _refresh_loop() -> None:
+    while True:
+        time.sleep(settings.CATALOG_SNAPSHOT_REFRESH_SECONDS)
+        try:
+            # This thread's connection is never closed by a request_finished signal.
+            close_old_connections()
+            _refresh()
+        except Exception:
+            logger.exception("Catalog snapshot refresh failed")
+
+
+def get_catalog_snapshot() -> Optional[CatalogSnapshot]:
+    """
+    Returns this worker's catalog snapshot, or None to fall back to the database.
+
+    The first call builds the snapshot synchronously and starts a daemon thread
+    that rebuilds it in the background whenever the catalog version changes;
+    afterwards this is a plain attribute read that never touches the database.
+
+    Returns:
+        Optional[CatalogSnapshot]: The snapshot, or None when disabled or over budget.
+    """
+    global _refresher_pid
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        return None
+    if _refresher_pid == os.getpid():
+        return _snapshot
+
+    with _lock:
+        # Threads do not survive fork(): a pre-forked worker starts its own.
+        if _refresher_pid != os.getpid():
+            _refresh()
+            threading.Thread(
+                target=_refresh_loop, name="catalog-snapshot", daemon=True
+            ).start()
+            _refresher_pid = os.getpid()
+    return _snapshot
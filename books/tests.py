@@ -1,3 +1,259 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from typing import List, Optional
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import snapshot
+from .changefeed import compact_book_changes
+from .models import Book, BookChange
+from .openlibrary_index import OpenLibraryIndex, SnapshotEntry, build_index
+from .search import PrefixIndex, build_prefix_index, refresh_prefix_index
+from .utils import get_book_data_from_api
+from .views import CATALOG_ORDERINGS, _catalog_books
+
+# Excerpts of the Open Library works, editions and ratings dumps.
+OPENLIBRARY_DUMPS: List[str] = [
+    os.path.join(os.path.dirname(__file__), "testdata", "openlibrary", name)
+    for name in ("works.txt", "editions.txt", "ratings.txt")
+]
+
+BOOKS_URL = "/api/libros/"
+CHANGES_URL = "/api/libros/cambios/"
+
+
+def _create_book(title: str, category: str = "Ensayo", days_ago: int = 0) -> Book:
+    return Book.objects.create(
+        title=title,
+        author="Autor",
+        category=category,
+        description="Descripción",
+        publication_date=timezone.now() - timedelta(days=days_ago),
+    )
+
+
+def _catalog_version() -> int:
+    return BookChange.objects.order_by("-id").values_list("id", flat=True)[0]
+
+
+def _days_later(days: int) -> mock._patch:
+    """
+    Moves the clock forward, as seen by the change feed and its compaction.
+    """
+    return mock.patch(
+        "django.utils.timezone.now",
+        return_value=timezone.now() + timedelta(days=days),
+    )
+
+
+class BookChangeFeedTests(TestCase):
+    def test_deleted_book_is_returned_as_tombstone(self) -> None:
+        book: Book = _create_book("Primavera silenciosa")
+        book_id: int = book.id
+        book.delete()
+
+        response = self.client.get(CHANGES_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(r["id"], r["action"], r["book"]) for r in response.json()["results"]],
+            [(book_id, BookChange.DELETED, None)],
+        )
+
+    def test_malformed_cursor_is_rejected(self) -> None:
+        response = self.client.get(CHANGES_URL, {"since": "abc"})
+
+        self.assertEqual(response.status_code, 400)
+
+    @mock.patch("books.views.CHANGES_PAGE_SIZE", 1)
+    def test_cursor_with_compacted_pending_tombstone_expires(self) -> None:
+        _create_book("Walden")
+        _create_book("La tierra baldía").delete()
+        BookChange.objects.update(changed_at=timezone.now() - timedelta(days=2))
+
+        first_page = self.client.get(CHANGES_URL).json()
+        self.assertTrue(first_page["has_more"])
+
+        # The client stops with the tombstone still unread and comes back within
+        # the retention window of its request, but after the tombstone itself
+        # aged out of it and was compacted.
+        with _days_later(29):
+            compact_book_changes()
+            self.assertFalse(
+                BookChange.objects.filter(action=BookChange.DELETED).exists()
+            )
+            response = self.client.get(CHANGES_URL, {"since": first_page["cursor"]})
+
+        self.assertEqual(response.status_code, 410)
+
+    def test_caught_up_cursor_survives_compaction(self) -> None:
+        _create_book("Walden")
+
+        first_page = self.client.get(CHANGES_URL).json()
+        self.assertFalse(first_page["has_more"])
+
+        with _days_later(29):
+            compact_book_changes()
+            response = self.client.get(CHANGES_URL, {"since": first_page["cursor"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [])
+
+
+# Memoize every prefix, so the few books of a test exercise the memo.
+@mock.patch("books.search.MEMO_MIN_MATCHES", 0)
+class PrefixIndexRefreshTests(TestCase):
+    QUERIES = ("e", "el", "se", "Señ", "SEÑOR", "camus", "tierra", "walden")
+
+    def _assert_same_suggestions(self, index: PrefixIndex, fresh: PrefixIndex) -> None:
+        for query in self.QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(index.suggest(query), fresh.suggest(query))
+
+    def test_refresh_matches_a_fresh_build(self) -> None:
+        _create_book("El señor de las moscas")
+        renamed: Book = _create_book("Walden")
+        deleted: Book = _create_book("El extranjero")
+        _create_book("La tierra baldía")
+        index: PrefixIndex = build_prefix_index(_catalog_version())
+        index.warm(["señ", "walden"])
+        self.assertIn("e", index._memo)
+
+        renamed.title = "El señor de los anillos"
+        renamed.save()
+        deleted.delete()
+        refreshed: PrefixIndex = refresh_prefix_index(index, _catalog_version())
+        fresh: PrefixIndex = build_prefix_index(_catalog_version())
+
+        self.assertEqual(refreshed.keys, fresh.keys)
+        self.assertEqual(refreshed.book_ids, fresh.book_ids)
+        self.assertEqual(refreshed.books, fresh.books)
+        self.assertEqual(
+            [book.title for book in refreshed.suggest("SEÑOR")],
+            ["El señor de las moscas", "El señor de los anillos"],
+        )
+        self.assertEqual(refreshed.suggest("walden"), [])
+        self._assert_same_suggestions(refreshed, fresh)
+
+
+# Each test starts without a snapshot, and the background refresher is not started.
+@mock.patch.multiple(snapshot, _snapshot=None, _built_version=None, _refresher_pid=None)
+@mock.patch("books.snapshot.threading.Thread", mock.Mock())
+@mock.patch("books.catalog.VERSION_CHECK_INTERVAL", 0)
+class CatalogSnapshotParityTests(TestCase):
+    CATEGORIES = (None, "Ensayo", "Novela", "Poesía")
+
+    def setUp(self) -> None:
+        _create_book("Walden", "Ensayo", days_ago=3)
+        _create_book("Ética", "Ensayo", days_ago=3)
+        _create_book("el extranjero", "Novela", days_ago=1)
+        _create_book("Primavera silenciosa", "Ensayo", days_ago=2)
+        _create_book("La peste", "Novela", days_ago=5)
+
+    def _ids(self, category: Optional[str], ordering: str, enabled: bool) -> List[int]:
+        with override_settings(CATALOG_SNAPSHOT_ENABLED=enabled):
+            return [book.id for book in _catalog_books(category, ordering)]
+
+    def _assert_parity(self) -> None:
+        for category in self.CATEGORIES:
+            for ordering in CATALOG_ORDERINGS:
+                with self.subTest(category=category, ordering=ordering):
+                    self.assertEqual(
+                        self._ids(category, ordering, enabled=True),
+                        self._ids(category, ordering, enabled=False),
+                    )
+
+    def test_snapshot_matches_the_database(self) -> None:
+        self._assert_parity()
+        self.assertIsNotNone(snapshot._snapshot)
+
+    def test_api_list_matches_the_database(self) -> None:
+        queries = (
+            {"category": "Ensayo"},
+            {"ordering": "-title"},
+            {"category": "Ensayo", "ordering": "-title", "limit": 2, "offset": 1},
+            {"limit": 2, "offset": 4},
+        )
+        for params in queries:
+            with self.subTest(params=params):
+                with override_settings(CATALOG_SNAPSHOT_ENABLED=True):
+                    from_snapshot = self.client.get(BOOKS_URL, params).json()
+                with override_settings(CATALOG_SNAPSHOT_ENABLED=False):
+                    from_database = self.client.get(BOOKS_URL, params).json()
+                self.assertEqual(from_snapshot, from_database)
+
+    def test_snapshot_is_rebuilt_after_a_book_save(self) -> None:
+        self._assert_parity()
+
+        book: Book = Book.objects.get(title="Walden")
+        book.title = "Walden dos"
+        book.category = "Poesía"
+        book.save()
+        # What the background refresher runs every CATALOG_SNAPSHOT_REFRESH_SECONDS.
+        snapshot._refresh()
+
+        self.assertEqual(self._ids("Poesía", "title", enabled=True), [book.id])
+        self._assert_parity()
+
+
+class OpenLibraryIndexTests(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.index_path: str = os.path.join(directory.name, "openlibrary.idx")
+        self.record_count: int = build_index(OPENLIBRARY_DUMPS, self.index_path)
+
+    def test_build_index_keeps_one_record_per_title(self) -> None:
+        # 'Rayuela' has two works and '¿?' normalizes to an empty title.
+        self.assertEqual(self.record_count, 3)
+        self.assertEqual(OpenLibraryIndex(self.index_path).record_count, 3)
+
+    def test_lookup_ignores_accents_and_case(self) -> None:
+        index = OpenLibraryIndex(self.index_path)
+
+        self.assertEqual(
+            index.lookup("el senor de los ANILLOS"),
+            SnapshotEntry(
+                cover_id=7363,
+                first_publish_year=1954,
+                publisher="Minotauro",
+                ratings_average=4.5,
+            ),
+        )
+        # The work with most editions wins; its year comes from the oldest edition.
+        self.assertEqual(
+            index.lookup("RAYUELA"),
+            SnapshotEntry(
+                cover_id=6385,
+                first_publish_year=1963,
+                publisher="Sudamericana",
+                ratings_average=3.0,
+            ),
+        )
+        self.assertEqual(
+            index.lookup("Ficciones"),
+            SnapshotEntry(
+                cover_id=None,
+                first_publish_year=1944,
+                publisher=None,
+                ratings_average=None,
+            ),
+        )
+
+    def test_lookup_miss_returns_none(self) -> None:
+        self.assertIsNone(OpenLibraryIndex(self.index_path).lookup("Pedro Páramo"))
+
+    @mock.patch("books.utils.requests.get")
+    def test_snapshot_mode_never_calls_the_api(self, get: mock.Mock) -> None:
+        with override_settings(
+            OPENLIBRARY_MODE="snapshot", OPENLIBRARY_INDEX_PATH=self.index_path
+        ):
+            found = get_book_data_from_api("Rayuela")
+            missing = get_book_data_from_api("Pedro Páramo")
+
+        self.assertEqual(found["publisher"], "Sudamericana")
+        self.assertIsNone(missing)
+        get.assert_not_called()
@@ -0,0 +1,21 @@
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes a title or author for accent- and case-insensitive matching.
+
+    Example: '  El Señor de los Anillos: ' -> 'el senor de los anillos'.
+
+    Args:
+        text (str): The raw text.
+
+    Returns:
+        str: Lower-case ASCII words separated by single spaces.
+    """
+    decomposed: str = unicodedata.normalize("NFKD", text.casefold())
+    ascii_text: str = decomposed.encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", ascii_text).strip()
@@ -18,6 +18,7 @@ urlpatterns = [
     path(
         "mis-libros-favoritos", views.favorites_books_view, name="favorites_books_view"
     ),
+    path("salud/listo/", views.readiness, name="readiness"),
     path("api/", include(router.urls)),
     path("api-auth/", include("rest_framework.urls")),
 ]
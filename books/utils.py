@@ -1,6 +1,8 @@
 import requests
 from requests import Response
 from typing import Optional, Dict, Any, List, Union
+from django.conf import settings
+from .openlibrary_index import SnapshotEntry, get_snapshot_index
 
 # --- HELPER FUNCTIONS ---
 
@@ -97,6 +99,18 @@ def _format_rating(rating: Optional[float]) -> Union[float, str]:
     return "Sin calificación"
 
 
+def _snapshot_book_data(entry: SnapshotEntry) -> Dict[str, Any]:
+    """
+    Formats a snapshot entry like the live API result of `get_book_data_from_api`.
+    """
+    return {
+        "ratings_average": _format_rating(entry.ratings_average),
+        "first_publish_year": entry.first_publish_year or "Desconocido",
+        "publisher": entry.publisher or "No especificada",
+        "cover_id": entry.cover_id,
+    }
+
+
 # --- MAIN ORCHESTRATOR ---
 
 
@@ -104,7 +118,11 @@ def get_book_data_from_api(title: str) -> Optional[Dict[str, Any]]:
     """
     Retrieves and processes book metadata from the Open Library API.
 
-    This function acts as an orchestrator, calling helper functions to:
+    Depending on settings.OPENLIBRARY_MODE the title is first resolved against the
+    local snapshot index ('snapshot' or 'snapshot_then_live'); the live API is only
+    called in 'live' mode or, in 'snapshot_then_live', when the snapshot has no match.
+
+    The live lookup acts as an orchestrator, calling helper functions to:
     1. Search for the book.
     2. Resolve the best possible publisher data (handling multiple API calls).
     3. Format ratings and extract metadata.
@@ -120,6 +138,15 @@ def get_book_data_from_api(title: str) -> Optional[Dict[str, Any]]:
             - 'cover_id'
         Returns None if the book is not found or API fails.
     """
+    mode: str = settings.OPENLIBRARY_MODE
+    if mode != "live":
+        index = get_snapshot_index(str(settings.OPENLIBRARY_INDEX_PATH))
+        entry: Optional[SnapshotEntry] = index.lookup(title) if index else None
+        if entry is not None:
+            return _snapshot_book_data(entry)
+        if mode == "snapshot":
+            return None
+
     # 1. Find the book
     work_doc = _fetch_work_by_title(title)
 
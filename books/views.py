@@ -1,51 +1,107 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from typing import Set, List, Type
-from .models import Book, Favorite
+from typing import Any, Dict, Iterable, List, Optional, Type
+from .favorites import FavoriteIds, get_favorite_ids
+from .models import Book, BookChange, Favorite
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.core.paginator import Page, Paginator
 from django.db.models import QuerySet
 from .utils import get_book_data_from_api
 
 
+from django.utils import timezone
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .changefeed import changes_since, decode_cursor, encode_cursor
+from .search import get_prefix_index
 from .serializers import BookSerializer
-
+from .snapshot import CatalogSnapshot, SnapshotRows, get_catalog_snapshot
+from .warmup import get_warmup_report, warm_up
 
 # Create your views here.
-def _favorites_books(user: User) -> Set[int | None]:
+HOME_PAGE_SIZE: int = 24
+FAVORITES_PAGE_SIZE: int = 20
+# Orderings accepted by the catalog views (the snapshot precomputes these).
+CATALOG_ORDERINGS: List[str] = [
+    "publication_date",
+    "-publication_date",
+    "title",
+    "-title",
+]
+CHANGES_PAGE_SIZE: int = 500
+
+
+def _favorites_books(user: User, books: Iterable[Any]) -> FavoriteIds:
     """
-        Search the favorites book of the current user.
+        Search which of the listed books are favorites of the current user.
     Args:
         user (User): The user in the current sesion.
+        books (Iterable[Any]): The books being rendered (Book or snapshot rows).
 
     Returns:
-        Set[int | NONE]: id's of the favorites book of the current user or none.
+        FavoriteIds: compact sorted id's of the listed books that are favorites of
+        the current user, read with a single query.
     """
-    favorites_id: Set[int | None] = set()
-    if user.is_authenticated:
-        favorites_id = set(
-            Favorite.objects.filter(user=user).values_list("book_id", flat=True)
-        )
+    return get_favorite_ids(user, [book.id for book in books])
+
+
+def _catalog_books(
+    category: Optional[str], ordering: str
+) -> SnapshotRows | QuerySet[Book]:
+    """
+        Select the catalog books to list, from the in-memory snapshot when available.
+    Args:
+        category (Optional[str]): Exact category to filter on, or None for all books.
+        ordering (str): One of CATALOG_ORDERINGS.
+
+    Returns:
+        SnapshotRows | QuerySet[Book]: The snapshot rows, or a queryset when the
+        snapshot is disabled or over its memory budget.
+    """
+    if ordering not in CATALOG_ORDERINGS:
+        ordering = CATALOG_ORDERINGS[0]
 
-    return favorites_id
+    snapshot: Optional[CatalogSnapshot] = get_catalog_snapshot()
+    if snapshot is not None:
+        return snapshot.select(category, ordering)
+
+    books: QuerySet[Book] = Book.objects.all()
+    if category:
+        books = books.filter(category=category)
+    return books.order_by(ordering, "id")
 
 
 def home(request: HttpRequest) -> HttpResponse:
     """
-    Render the home page with a list of all books.
+    Render the home page with a page of the catalog.
+
+    Supports `?categoria=<category>`, `?orden=<ordering>` (see CATALOG_ORDERINGS)
+    and `?page=<n>`. Books are read from the worker's catalog snapshot.
 
     Args:
         request (HttpRequest): The incoming HTTP request.
 
     Returns:
         HttpResponse: Renders the 'books/home.html' template with the
-        context containing the list of books ordered by creation date.
+        context containing a page of books ordered by creation date by default.
     """
-    books: QuerySet[Book] = Book.objects.all().order_by("publication_date")
-    favorites_id: Set[int] = _favorites_books(request.user)
-    context = {"books": books, "favorites_id": favorites_id}
+    category: Optional[str] = request.GET.get("categoria") or None
+    ordering: str = request.GET.get("orden", CATALOG_ORDERINGS[0])
+    books = _catalog_books(category, ordering)
+    page: Page = Paginator(books, HOME_PAGE_SIZE).get_page(request.GET.get("page"))
+    favorites_id: FavoriteIds = _favorites_books(request.user, page)
+    context = {
+        "books": page,
+        "page_obj": page,
+        "favorites_id": favorites_id,
+        "category": category,
+        "ordering": ordering,
+    }
     return render(request, "books/home.html", context)
 
 
@@ -84,10 +140,10 @@ def toggle_favorite(request: HttpRequest, book_id: int) -> HttpResponse:
 
     book: Book = get_object_or_404(Book, id=book_id)
 
-    is_favorite: bool = Favorite.objects.filter(user=request.user, book=book).exists()
+    # A single DELETE tells us whether the book was a favorite.
+    deleted, _ = Favorite.objects.filter(user=request.user, book=book).delete()
 
-    if is_favorite:
-        Favorite.objects.filter(user=request.user, book=book).delete()
+    if deleted:
         messages.info(request, f"'{book.title}' quitado de favoritos")
     else:
         Favorite.objects.create(user=request.user, book=book)
@@ -99,18 +155,74 @@ def toggle_favorite(request: HttpRequest, book_id: int) -> HttpResponse:
 @login_required
 def favorites_books_view(request: HttpRequest) -> HttpResponse:
     """
-        Render the favorite book page of the current user.
+        Render the favorite book page of the current user, one page at a time.
+
+    Pages use keyset pagination on the Favorite id: `?cursor=<id>` returns the
+    favorites added after that one, so deep pages cost the same as the first.
     Args:
         request (HttpRequest): The incoming HTTP request.
 
     Returns:
-        HttpResponse: Renders the 'books/favorites_book.html' with all the favorites books of user
+        HttpResponse: Renders the 'books/favorites_book.html' with a page of the favorites books of user
     """
-    favorites_books = Favorite.objects.filter(user=request.user).select_related("book")
+    favorites_books: QuerySet[Favorite] = (
+        Favorite.objects.filter(user=request.user).select_related("book").order_by("id")
+    )
+    cursor: str = request.GET.get("cursor", "")
+    if cursor.isdigit():
+        favorites_books = favorites_books.filter(id__gt=int(cursor))
+
+    page: List[Favorite] = list(favorites_books[: FAVORITES_PAGE_SIZE + 1])
+    next_cursor: Optional[int] = None
+    if len(page) > FAVORITES_PAGE_SIZE:
+        page = page[:FAVORITES_PAGE_SIZE]
+        next_cursor = page[-1].id
 
-    return render(
-        request, "books/favorites_books.html", {"favorites_books": favorites_books}
+    context: Dict[str, Any] = {
+        "favorites_books": page,
+        "next_cursor": next_cursor,
+        "is_first_page": not cursor,
+    }
+    return render(request, "books/favorites_books.html", context)
+
+
+def readiness(request: HttpRequest) -> JsonResponse:
+    """
+    Readiness probe for the autoscaler.
+
+    Runs the warmup if the process did not run it at startup (e.g.
+    WARMUP_ON_STARTUP disabled) or if a step failed, so the worker only reports
+    ready once its templates, URLconf, DB connection and caches are primed.
+    Error details are only shown to staff; they are always in the logs.
+
+    Args:
+        request (HttpRequest): The incoming HTTP request.
+
+    Returns:
+        JsonResponse: The warmup report, including the time each step took, and
+        the size of the worker's catalog snapshot. HTTP 503 while not ready.
+    """
+    report: Optional[Dict[str, Any]] = get_warmup_report()
+    if report is None or not report["ready"]:
+        report = warm_up()
+
+    report = dict(report)
+    if not request.user.is_staff:
+        report["steps"] = {
+            name: {**step, "error": step["error"] is not None}
+            for name, step in report["steps"].items()
+        }
+    snapshot: Optional[CatalogSnapshot] = get_catalog_snapshot()
+    report["catalog_snapshot"] = (
+        {
+            "version": snapshot.version,
+            "books": len(snapshot),
+            "memory_bytes": snapshot.memory_bytes,
+        }
+        if snapshot is not None
+        else None
     )
+    return JsonResponse(report, status=200 if report["ready"] else 503)
 
 
 class BookViewSet(viewsets.ModelViewSet):
@@ -128,19 +240,110 @@ class BookViewSet(viewsets.ModelViewSet):
 
     queryset: QuerySet[Book] = Book.objects.all().order_by("publication_date")
     serializer_class: Type[BookSerializer] = BookSerializer
+    # Only paginates when `?limit=` is given, so the plain list keeps its shape.
+    pagination_class = LimitOffsetPagination
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Lists the books from the worker's catalog snapshot.
+
+        Supports `?category=<category>`, `?ordering=<ordering>` (see
+        CATALOG_ORDERINGS) and `?limit=<n>&offset=<n>` pagination.
+
+        Args:
+            request (Request): The incoming API request.
+
+        Returns:
+            Response: The serialized books, paginated when `limit` is given.
+        """
+        books = _catalog_books(
+            request.query_params.get("category") or None,
+            request.query_params.get("ordering", CATALOG_ORDERINGS[0]),
+        )
+        page = self.paginate_queryset(books)
+        if page is None:
+            return Response(self.get_serializer(books, many=True).data)
+
+        # Only the page's favorites, instead of every favorite of the user.
+        context: Dict[str, Any] = super().get_serializer_context()
+        context["favorite_ids"] = get_favorite_ids(
+            request.user, [book.id for book in page]
+        )
+        return self.get_paginated_response(
+            self.get_serializer(page, many=True, context=context).data
+        )
+
+    def get_serializer_context(self) -> Dict[str, Any]:
+        """
+        Adds the current user's favorite ids so `is_favorite` needs no query per book.
+        """
+        context: Dict[str, Any] = super().get_serializer_context()
+        context["favorite_ids"] = get_favorite_ids(self.request.user)
+        return context
+
+    @action(detail=False, methods=["get"], url_path="cambios")
+    def changes(self, request: Request) -> Response:
+        """
+        Incremental change feed for catalog sync: `/api/libros/cambios/?since=<cursor>`.
+
+        Without `since` the whole change log is replayed. Each result holds the
+        book id, the action and the serialized book, or `null` for deletions
+        (tombstones). Clients store the returned `cursor` and keep calling while
+        `has_more` is true; a cursor older than the retention window gets HTTP 410.
+
+        Args:
+            request (Request): The incoming API request.
+
+        Returns:
+            Response: The 'cursor', 'has_more' and 'results' of this page.
+        """
+        last_change_id: int = 0
+        since: str = request.query_params.get("since", "")
+        if since:
+            last_change_id, _ = decode_cursor(since)
+
+        synced_at = timezone.now()
+        entries, last_read, has_more = changes_since(last_change_id, CHANGES_PAGE_SIZE)
+
+        live_books: List[Book] = [book for _, book in entries if book is not None]
+        serialized: Dict[int, Dict[str, Any]] = {
+            data["id"]: data for data in self.get_serializer(live_books, many=True).data
+        }
+        results: List[Dict[str, Any]] = [
+            {
+                "id": change.book_id,
+                "action": change.action if book is not None else BookChange.DELETED,
+                "changed_at": change.changed_at,
+                "book": serialized.get(change.book_id),
+            }
+            for change, book in entries
+        ]
+
+        cursor_id: int = last_read.id if last_read is not None else last_change_id
+        # With more pages pending, no unread change is older than the last one read;
+        # a caught-up client only has changes after `synced_at` left to read.
+        watermark = last_read.changed_at if has_more else synced_at
+        return Response(
+            {
+                "cursor": encode_cursor(cursor_id, watermark),
+                "has_more": has_more,
+                "results": results,
+            }
+        )
 
     def get_permissions(self) -> List[permissions.BasePermission]:
         """
         Instantiates and returns the list of permissions that this view requires.
 
-        - For 'list' and 'retrieve' actions (GET): Allows access to any user (AllowAny).
+        - For 'list', 'retrieve', 'changes' and 'suggestions' actions (GET): Allows access
+          to any user (AllowAny).
         - For 'create', 'update', and 'destroy' actions: Requires the user to be an
           administrator (IsAdminUser).
 
         Returns:
             List[permissions.BasePermission]: A list of permission instances.
         """
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "changes", "suggestions"]:
             permission_classes: List[Type[permissions.BasePermission]] = [
                 permissions.AllowAny
             ]
@@ -150,3 +353,27 @@ class BookViewSet(viewsets.ModelViewSet):
             ]
 
         return [permission() for permission in permission_classes]
+
+    @action(detail=False, methods=["get"], url_path="sugerencias")
+    def suggestions(self, request: Request) -> Response:
+        """
+        Title/author typeahead: `/api/libros/sugerencias/?q=<text>`.
+
+        Served from the per-process prefix index, without querying the books
+        table. Matching ignores case and accents and works on any word of the
+        title or author.
+
+        Args:
+            request (Request): The incoming API request.
+
+        Returns:
+            Response: Up to 10 books ordered by popularity (number of favorites).
+        """
+        query: str = request.query_params.get("q", "")
+        suggestions = get_prefix_index().suggest(query) if query.strip() else []
+        return Response(
+            [
+                {"id": book.id, "title": book.title, "author": book.author}
+                for book in suggestions
+            ]
+        )
@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+from .catalog import current_catalog_version
+from .openlibrary_index import get_snapshot_index
+from .search import get_prefix_index
+from .snapshot import get_catalog_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Apps whose templates are compiled during warmup, besides TEMPLATES["DIRS"].
+WARMUP_TEMPLATE_APPS: List[str] = ["books", "users"]
+
+_report: Optional[Dict[str, Any]] = None
+
+
+def _template_names() -> List[str]:
+    """
+    Lists the templates of WARMUP_TEMPLATE_APPS and of the project template dirs.
+    """
+    roots: List[str] = [str(d) for engine in settings.TEMPLATES for d in engine["DIRS"]]
+    roots += [
+        os.path.join(apps.get_app_config(label).path, "templates")
+        for label in WARMUP_TEMPLATE_APPS
+    ]
+
+    names: List[str] = []
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(".html"):
+                    relative: str = os.path.relpath(
+                        os.path.join(dirpath, filename), root
+                    )
+                    names.append(relative.replace(os.sep, "/"))
+    return names
+
+
+def _warm_templates() -> int:
+    # With the cached loader (the default), get_template stores the compiled
+    # template, so the first render no longer parses it.
+    names: List[str] = _template_names()
+    for name in names:
+        get_template(name)
+    return len(names)
+
+
+def _warm_urls() -> int:
+    resolver = get_resolver()
+    # Accessing reverse_dict imports every view module and builds the lookup tables.
+    return len(resolver.reverse_dict)
+
+
+def _warm_database() -> int:
+    for alias in connections:
+        connections[alias].ensure_connection()
+    return len(connections.all())
+
+
+def _warm_caches() -> int:
+    get_snapshot_index(str(settings.OPENLIBRARY_INDEX_PATH))
+    current_catalog_version()
+    get_catalog_snapshot()
+    return len(get_prefix_index().keys)
+
+
+def warm_up(started_at: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Prepares the current process to serve requests and records a startup report.
+
+    Compiles the templates, builds the URL resolver, opens the DB connections and
+    primes the in-process catalog caches, timing each step. Failures are logged
+    and reported but never raised, so a warmup problem cannot keep a worker down;
+    the report is only 'ready' when every step succeeded.
+
+    Args:
+        started_at (Optional[float]): `time.perf_counter()` taken when the process
+            started loading the application, to report the total startup time.
+
+    Returns:
+        Dict[str, Any]: The report, also returned by `get_warmup_report`.
+    """
+    global _report
+    steps: Dict[str, Callable[[], int]] = {
+        "templates": _warm_templates,
+        "urls": _warm_urls,
+        "database": _warm_database,
+        "caches": _warm_caches,
+    }
+
+    report: Dict[str, Any] = {"steps": {}}
+    warmup_start: float = time.perf_counter()
+    for name, step in steps.items():
+        step_start: float = time.perf_counter()
+        try:
+            count: Optional[int] = step()
+            error: Optional[str] = None
+        except Exception as exc:
+            logger.exception("Warmup step '%s' failed", name)
+            count, error = None, repr(exc)
+        report["steps"][name] = {
+            "ms": round((time.perf_counter() - step_start) * 1000, 2),
+            "count": count,
+            "error": error,
+        }
+
+    report["ready"] = all(step["error"] is None for step in report["steps"].values())
+    finished: float = time.perf_counter()
+    report["warmup_ms"] = round((finished - warmup_start) * 1000, 2)
+    if started_at is not None:
+        report["startup_ms"] = round((finished - started_at) * 1000, 2)
+
+    logger.info("Warmup finished: %s", report)
+    _report = report
+    return report
+
+
+def get_warmup_report() -> Optional[Dict[str, Any]]:
+    """
+    Returns the report of the last warmup in this process, or None if it never ran.
+    """
+    return _report
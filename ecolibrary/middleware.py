@@ -0,0 +1,205 @@
+import mimetypes
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Set
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpRequest, HttpResponse
+
+from .profiling import Sampler, is_valid_profile_token, write_profile
+
+# Hashed file names change whenever their content changes, so they never need revalidation.
+IMMUTABLE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+# Unhashed names (e.g. 'css/bootstrap.min.css') may change on the next deploy.
+SHORT_CACHE_CONTROL: str = "public, max-age=60"
+
+# Preferred order when the client accepts several encodings.
+ENCODING_SUFFIXES: Dict[str, str] = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class StaticAsset:
+    """
+    A collected static file and the precompressed variants available for it.
+
+    Attributes:
+        path (str): Absolute path of the uncompressed file.
+        content_type (str): The MIME type served for the file and all its variants.
+        immutable (bool): True when the name is content-hashed in the manifest.
+        variants (Dict[str, str]): Content-Encoding -> absolute path of the encoded file.
+    """
+
+    path: str
+    content_type: str
+    immutable: bool
+    variants: Dict[str, str] = field(default_factory=dict)
+
+
+def _accepted_encodings(request: HttpRequest) -> Set[str]:
+    """
+    Parses the Accept-Encoding header, ignoring encodings explicitly refused with q=0.
+
+    Args:
+        request (HttpRequest): The incoming HTTP request.
+
+    Returns:
+        Set[str]: The lower-cased encoding names the client accepts.
+    """
+    accepted: Set[str] = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality: str = params.strip().lower()
+        try:
+            if quality.startswith("q=") and float(quality[2:]) == 0:
+                continue
+        except ValueError:
+            continue
+        if encoding:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class CompressedStaticMiddleware:
+    """
+    Serves collected static files with far-future caching and precompressed variants.
+
+    The files under STATIC_ROOT are indexed once at startup. For each request the best
+    variant accepted by the client (brotli, then gzip, then identity) is streamed with
+    'Vary: Accept-Encoding'. Content-hashed names listed in the manifest are marked
+    immutable, so repeat visits do not even revalidate them.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        if not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed("STATIC_ROOT is not configured.")
+
+        self.get_response = get_response
+        self.prefix: str = settings.STATIC_URL
+        self.assets: Dict[str, StaticAsset] = self._build_index(
+            str(settings.STATIC_ROOT)
+        )
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.method in ("GET", "HEAD") and request.path_info.startswith(
+            self.prefix
+        ):
+            asset = self.assets.get(request.path_info[len(self.prefix) :])
+            if asset is not None:
+                return self._serve(request, asset)
+
+        return self.get_response(request)
+
+    def _build_index(self, root: str) -> Dict[str, StaticAsset]:
+        """
+        Walks STATIC_ROOT and groups every file with its '.gz'/'.br' siblings.
+
+        Args:
+            root (str): The absolute STATIC_ROOT path.
+
+        Returns:
+            Dict[str, StaticAsset]: URL path relative to STATIC_URL -> asset.
+        """
+        hashed_names: Set[str] = set(
+            getattr(staticfiles_storage, "hashed_files", {}).values()
+        )
+        files: Set[str] = set()
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                relative: str = os.path.relpath(os.path.join(dirpath, filename), root)
+                files.add(relative.replace(os.sep, "/"))
+
+        encoded_suffixes: List[str] = list(ENCODING_SUFFIXES.values())
+        assets: Dict[str, StaticAsset] = {}
+        for name in files:
+            if any(name.endswith(suffix) for suffix in encoded_suffixes):
+                continue
+            content_type, _ = mimetypes.guess_type(name)
+            asset = StaticAsset(
+                path=os.path.join(root, name),
+                content_type=content_type or "application/octet-stream",
+                immutable=name in hashed_names,
+            )
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                if name + suffix in files:
+                    asset.variants[encoding] = os.path.join(root, name + suffix)
+            assets[name] = asset
+        return assets
+
+    def _serve(self, request: HttpRequest, asset: StaticAsset) -> HttpResponse:
+        """
+        Streams the best variant of an asset for the client's Accept-Encoding.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+            asset (StaticAsset): The indexed file to serve.
+
+        Returns:
+            HttpResponse: A FileResponse with caching and encoding headers set.
+        """
+        path: str = asset.path
+        content_encoding: str = ""
+        if asset.variants:
+            accepted: Set[str] = _accepted_encodings(request)
+            for encoding in ENCODING_SUFFIXES:
+                if encoding in accepted and encoding in asset.variants:
+                    path = asset.variants[encoding]
+                    content_encoding = encoding
+                    break
+
+        response = FileResponse(open(path, "rb"), content_type=asset.content_type)
+        # FileResponse derives a Content-Disposition from the file name, which would
+        # expose the '.gz'/'.br' suffix; static assets are always displayed inline.
+        del response["Content-Disposition"]
+        if content_encoding:
+            response["Content-Encoding"] = content_encoding
+        if asset.variants:
+            response["Vary"] = "Accept-Encoding"
+        response["Cache-Control"] = (
+            IMMUTABLE_CACHE_CONTROL if asset.immutable else SHORT_CACHE_CONTROL
+        )
+        return response
+
+
+class SamplingProfilerMiddleware:
+    """
+    Profiles a single request on demand with a sampling profiler.
+
+    A request is profiled when a staff user adds `?profile=1`, or when it carries
+    a valid signed `X-Profile-Token` header (see the staff page at /perfiles/).
+    The collapsed stacks are written to PROFILING_DIR and the file name is
+    returned in the `X-Profile` response header. With PROFILING_ENABLED off the
+    middleware removes itself from the chain at startup.
+
+    Must be placed after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed("PROFILING_ENABLED is off.")
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not self._should_profile(request):
+            return self.get_response(request)
+
+        started: float = time.perf_counter()
+        with Sampler(settings.PROFILING_INTERVAL) as sampler:
+            response = self.get_response(request)
+        elapsed_ms: float = (time.perf_counter() - started) * 1000
+
+        response["X-Profile"] = write_profile(request, sampler, elapsed_ms)
+        return response
+
+    def _should_profile(self, request: HttpRequest) -> bool:
+        """
+        Checks the cheap request markers first; the user is only loaded if asked.
+        """
+        token: str = request.headers.get("X-Profile-Token", "")
+        if token:
+            return is_valid_profile_token(token)
+        if request.GET.get("profile") == "1":
+            return request.user.is_staff
+        return False
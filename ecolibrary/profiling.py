@@ -0,0 +1,206 @@
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from types import FrameType, TracebackType
+from typing import Any, Dict, List, Optional, Type
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core import signing
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.shortcuts import render
+
+TOKEN_SALT: str = "ecolibrary.profiling"
+PROFILE_SUFFIX: str = ".collapsed"
+# Deeper stacks are truncated at the root side; recursion should not blow up a file.
+MAX_STACK_DEPTH: int = 200
+# Bounds the samples (and so the time and file size) of a single profile.
+MAX_SAMPLES: int = 20_000
+
+_UNSAFE = re.compile(r"[^0-9A-Za-z]+")
+
+
+class Sampler:
+    """
+    Statistical profiler for a single thread, used as a context manager.
+
+    A daemon thread wakes up every `interval` seconds, reads the target thread's
+    current frame from `sys._current_frames()` and counts its collapsed stack.
+    The profiled code runs unmodified (no tracing hooks), so the overhead is one
+    stack walk per interval.
+
+    Attributes:
+        stacks (Counter): Collapsed stack ('module:function;...') -> number of samples.
+    """
+
+    def __init__(self, interval: float, thread_id: Optional[int] = None) -> None:
+        self.interval: float = interval
+        self.thread_id: int = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-sampler", daemon=True
+        )
+
+    def __enter__(self) -> "Sampler":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        samples: int = 0
+        while not self._stop.wait(self.interval) and samples < MAX_SAMPLES:
+            frame: Optional[FrameType] = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+                samples += 1
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    """
+    Formats a stack root-first as 'module:function;module:function;...'.
+    """
+    names: List[str] = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        module: str = frame.f_globals.get("__name__", "?")
+        names.append(f"{module}:{frame.f_code.co_name}".replace(";", ","))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def make_profile_token() -> str:
+    """
+    Returns a signed token for the X-Profile-Token header.
+
+    Valid for PROFILING_TOKEN_MAX_AGE seconds; lets a non-staff client (e.g. the
+    mobile app or curl) ask for a profile of one request.
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign("profile")
+
+
+def is_valid_profile_token(token: str) -> bool:
+    """
+    Checks a token built by `make_profile_token`, including its age.
+    """
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def write_profile(request: HttpRequest, sampler: Sampler, elapsed_ms: float) -> str:
+    """
+    Writes the collapsed stacks of a request to PROFILING_DIR and rotates old files.
+
+    Each line is '<stack> <samples>', the input format of flamegraph.pl, and
+    can be opened directly in speedscope.
+
+    Args:
+        request (HttpRequest): The profiled request, used to name the file.
+        sampler (Sampler): The finished sampler.
+        elapsed_ms (float): The wall time of the request.
+
+    Returns:
+        str: The file name of the profile.
+    """
+    directory: str = str(settings.PROFILING_DIR)
+    os.makedirs(directory, exist_ok=True)
+
+    timestamp: str = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path_slug: str = _UNSAFE.sub("_", request.path).strip("_")[:60] or "root"
+    name: str = (
+        f"{timestamp}-{request.method}-{path_slug}-{int(elapsed_ms)}ms{PROFILE_SUFFIX}"
+    )
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as profile:
+        for stack, count in sampler.stacks.most_common():
+            profile.write(f"{stack} {count}\n")
+
+    for old in list_profiles()[settings.PROFILING_MAX_FILES :]:
+        try:
+            os.remove(os.path.join(directory, old["name"]))
+        except OSError:
+            pass
+    return name
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """
+    Lists the stored profiles, newest first.
+
+    Returns:
+        List[Dict[str, Any]]: The 'name', 'size' and 'modified' time of each profile.
+    """
+    directory: str = str(settings.PROFILING_DIR)
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return []
+
+    profiles: List[Dict[str, Any]] = [
+        {
+            "name": entry.name,
+            "size": entry.stat().st_size,
+            "modified": datetime.fromtimestamp(entry.stat().st_mtime),
+        }
+        for entry in entries
+        if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX)
+    ]
+    profiles.sort(key=lambda profile: profile["name"], reverse=True)
+    return profiles
+
+
+@staff_member_required
+def profiles_view(request: HttpRequest) -> HttpResponse:
+    """
+    Render the list of captured request profiles (staff only).
+
+    Args:
+        request (HttpRequest): The incoming HTTP request.
+
+    Returns:
+        HttpResponse: Renders 'profiling/profiles.html' with the profiles and a
+        fresh X-Profile-Token.
+    """
+    context: Dict[str, Any] = {
+        "profiles": list_profiles(),
+        "token": make_profile_token(),
+        "token_max_age": settings.PROFILING_TOKEN_MAX_AGE,
+    }
+    return render(request, "profiling/profiles.html", context)
+
+
+@staff_member_required
+def profile_download(request: HttpRequest, name: str) -> FileResponse:
+    """
+    Download one captured profile (staff only).
+
+    Args:
+        request (HttpRequest): The incoming HTTP request.
+        name (str): The profile file name, as listed by `profiles_view`.
+
+    Returns:
+        FileResponse: The collapsed stacks as a text attachment. Raises Http404
+        if the name is not a stored profile.
+    """
+    if name not in {profile["name"] for profile in list_profiles()}:
+        raise Http404("Perfil no encontrado")
+    return FileResponse(
+        open(os.path.join(str(settings.PROFILING_DIR), name), "rb"),
+        as_attachment=True,
+        filename=name,
+        content_type="text/plain; charset=utf-8",
+    )
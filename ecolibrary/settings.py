@@ -45,10 +45,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "ecolibrary.middleware.CompressedStaticMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "ecolibrary.middleware.SamplingProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -80,6 +82,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Keep connections open between requests so only the warmup pays for them.
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -122,6 +127,23 @@ STATIC_URL = "static/"
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
+STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+
+# Hashed file names plus .gz/.br variants, served by CompressedStaticMiddleware.
+# The manifest storage fails to render any template until `collectstatic` has
+# run, so development (DEBUG) and the test runner use the plain storage.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "ecolibrary.staticfiles.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -132,6 +154,30 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 LOGIN_URL = "/iniciar-sesion/"
 LOGIN_REDIRECT_URL = "home"
 LOGOUT_REDIRECT_URL = "home"
+# Tombstones older than this are compacted; older feed cursors get HTTP 410.
+BOOK_CHANGES_RETENTION_DAYS = 30
+# Open Library metadata source: "live" (search.json on every detail page),
+# "snapshot" (local index only) or "snapshot_then_live" (index, then live on a miss).
+# The index is built with `python manage.py build_openlibrary_index <dump files>`.
+OPENLIBRARY_MODE = "snapshot_then_live"
+OPENLIBRARY_INDEX_PATH = BASE_DIR / "openlibrary_snapshot.idx"
+# Per-worker, in-memory copy of the Book table used by the home page and the
+# book list API. It is rebuilt in the background when the catalog changes and
+# disabled (falling back to the DB) if it would exceed the memory budget.
+CATALOG_SNAPSHOT_ENABLED = True
+CATALOG_SNAPSHOT_MAX_BYTES = 64 * 1024 * 1024
+CATALOG_SNAPSHOT_REFRESH_SECONDS = 2
+# On-demand request profiling (staff `?profile=1` or a signed X-Profile-Token).
+# Off by default: tokens are signed with SECRET_KEY, so only enable it where
+# that key is actually secret. When disabled the middleware is dropped at
+# startup and costs nothing.
+PROFILING_ENABLED = False
+PROFILING_DIR = BASE_DIR / "profiles"
+PROFILING_INTERVAL = 0.005
+PROFILING_MAX_FILES = 50
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+# Run books.warmup.warm_up() when the WSGI/ASGI application is loaded.
+WARMUP_ON_STARTUP = True
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
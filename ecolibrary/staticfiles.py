@@ -0,0 +1,90 @@
+import gzip
+from typing import Any, Iterator, Optional, Set, Tuple, Union
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional dependency
+    brotli = None
+
+# Only text assets benefit from compression; images and fonts are already packed.
+COMPRESSIBLE_EXTENSIONS: Tuple[str, ...] = (
+    ".css",
+    ".js",
+    ".map",
+    ".svg",
+    ".txt",
+    ".json",
+    ".html",
+)
+# Below this size the encoded variant is not worth an extra file on disk.
+MIN_COMPRESS_SIZE: int = 512
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes gzip and brotli variants at collectstatic time.
+
+    Every file is stored under a content-hashed name (e.g. 'bootstrap.min.<hash>.css')
+    recorded in 'staticfiles.json'. Next to each text asset a '.gz' and, when the
+    optional 'brotli' package is installed, a '.br' file are written so that
+    'CompressedStaticMiddleware' can serve them without compressing per request.
+    """
+
+    def post_process(
+        self, paths: Any, dry_run: bool = False, **options: Any
+    ) -> Iterator[Tuple[str, Optional[str], Union[bool, Exception]]]:
+        """
+        Runs the manifest post-processing and compresses the resulting files.
+
+        Args:
+            paths: The collected files, as passed by collectstatic.
+            dry_run (bool): When True nothing is written to disk.
+
+        Yields:
+            Tuple: The (original name, hashed name, processed) triples of the parent storage.
+        """
+        stored_names: Set[str] = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                stored_names.update((name, hashed_name))
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+
+        for name in sorted(stored_names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self._write_compressed_variants(name)
+
+    def _write_compressed_variants(self, name: str) -> None:
+        """
+        Writes the '.gz' and '.br' siblings of a stored file.
+
+        A variant is skipped when it would not be meaningfully smaller than the original.
+
+        Args:
+            name (str): The stored file name, relative to STATIC_ROOT.
+        """
+        with self.open(name) as original:
+            content: bytes = original.read()
+
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+
+        # mtime=0 keeps the gzip output reproducible between deploys.
+        variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(content)
+
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(content) * 0.95:
+                continue
+            encoded_name: str = name + suffix
+            if self.exists(encoded_name):
+                self.delete(encoded_name)
+            self._save(encoded_name, ContentFile(compressed))
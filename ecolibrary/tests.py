@@ -0,0 +1,91 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from typing import Dict
+from unittest import mock
+
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .middleware import (
+    IMMUTABLE_CACHE_CONTROL,
+    SHORT_CACHE_CONTROL,
+    CompressedStaticMiddleware,
+)
+
+# Collected file -> content; 'app.css' is the unhashed copy of 'app.0123abcd.css'.
+STATIC_FILES: Dict[str, bytes] = {
+    "css/app.0123abcd.css": b"hashed",
+    "css/app.0123abcd.css.gz": b"gzip",
+    "css/app.0123abcd.css.br": b"brotli",
+    "css/app.css": b"plain",
+}
+
+
+def _not_static(request: HttpRequest) -> HttpResponse:
+    return HttpResponse("view")
+
+
+class CompressedStaticMiddlewareTests(SimpleTestCase):
+    def setUp(self) -> None:
+        static_root: str = tempfile.mkdtemp()
+        for name, content in STATIC_FILES.items():
+            path: str = os.path.join(static_root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as static_file:
+                static_file.write(content)
+
+        storage = SimpleNamespace(hashed_files={"css/app.css": "css/app.0123abcd.css"})
+        with override_settings(STATIC_ROOT=static_root), mock.patch(
+            "ecolibrary.middleware.staticfiles_storage", storage
+        ):
+            self.middleware = CompressedStaticMiddleware(_not_static)
+        self.factory = RequestFactory()
+
+    def _get(self, path: str, accept_encoding: str = "") -> HttpResponse:
+        request = self.factory.get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return self.middleware(request)
+
+    def _body(self, response: HttpResponse) -> bytes:
+        content: bytes = b"".join(response.streaming_content)
+        response.close()
+        return content
+
+    def test_prefers_brotli_then_gzip(self) -> None:
+        response = self._get("/static/css/app.0123abcd.css", "gzip, deflate, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(self._body(response), b"brotli")
+
+    def test_encoding_refused_with_q_zero_is_skipped(self) -> None:
+        response = self._get("/static/css/app.0123abcd.css", "br;q=0, gzip;q=0.5")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(self._body(response), b"gzip")
+
+    def test_identity_when_no_encoding_accepted(self) -> None:
+        response = self._get("/static/css/app.0123abcd.css")
+
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(self._body(response), b"hashed")
+
+    def test_hashed_names_are_immutable(self) -> None:
+        response = self._get("/static/css/app.0123abcd.css")
+        self._body(response)
+
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+
+    def test_unhashed_names_get_a_short_cache(self) -> None:
+        response = self._get("/static/css/app.css", "gzip")
+
+        self.assertEqual(response["Cache-Control"], SHORT_CACHE_CONTROL)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertNotIn("Vary", response)
+        self.assertEqual(self._body(response), b"plain")
+
+    def test_unknown_paths_reach_the_view(self) -> None:
+        response = self._get("/static/css/missing.css")
+
+        self.assertEqual(response.content, b"view")
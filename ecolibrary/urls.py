@@ -19,9 +19,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .profiling import profile_download, profiles_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("perfiles/", profiles_view, name="profiles"),
+    path("perfiles/<str:name>", profile_download, name="profile_download"),
     path("", include("users.urls")),
     path("", include("books.urls")),
 ]
@@ -8,9 +8,22 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
 import os
+import time
 
-from django.core.wsgi import get_wsgi_application
+_started_at = time.perf_counter()
+
+from django.conf import settings  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecolibrary.settings')
 
 application = get_wsgi_application()
+
+# Compile templates, build the URL resolver, connect to the DB and prime the
+# catalog caches before the first request instead of during it. With
+# gunicorn --preload this runs in the master: disable it there, since DB
+# connections must not be shared across forked workers.
+if settings.WARMUP_ON_STARTUP:
+    from books.warmup import warm_up
+
+    warm_up(started_at=_started_at)